@@ -1,23 +1,63 @@
+import multiprocessing
+import multiprocessing.pool
 import random
 import re
-from typing import List, Dict
+import zipfile
+from functools import lru_cache
+from typing import List, Dict, Optional
 
 import nltk
-from docx import Document
+import numpy as np
+from lxml import etree
+
+try:
+    import spacy
+except ImportError:  # spaCy is optional; NLTK tagging is the fallback
+    spacy = None
+
+
+_NLP_READY = False
+_TAGGER = None
+_SPACY_NLP = None
+
+
+def _ensure_nlp() -> None:
+    global _NLP_READY, _TAGGER, _SPACY_NLP
+    if _NLP_READY:
+        return
+    for resource, package in (
+            ('corpora/wordnet', 'wordnet'),
+            ('tokenizers/punkt_tab', 'punkt_tab'),
+            ('taggers/averaged_perceptron_tagger_eng', 'averaged_perceptron_tagger_eng'),
+            ('corpora/stopwords', 'stopwords'),
+    ):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, quiet=True)
+    nltk.corpus.wordnet.ensure_loaded()
+    nltk.corpus.wordnet.synsets('test')  # warm the lazy synset index
+    _TAGGER = nltk.tag.PerceptronTagger()  # nltk.pos_tag reloads this model per call
+    if spacy is not None:
+        try:
+            _SPACY_NLP = spacy.load(
+                'en_core_web_sm',
+                disable=['parser', 'ner', 'lemmatizer', 'attribute_ruler'],
+            )
+        except OSError:  # model not downloaded
+            _SPACY_NLP = None
+    _NLP_READY = True
 
 
 def initialize_nlp_resources() -> Dict:
     """
-    Initialize required NLP resources without using global variables.
+    Initialize required NLP resources, downloading NLTK data only on first use.
     """
-    nltk.download('wordnet', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-    nltk.download('stopwords', quiet=True)
+    _ensure_nlp()
 
     return {
         "lemmatizer": nltk.stem.WordNetLemmatizer(),
-        "stop_words": set(nltk.corpus.stopwords.words('english')),
+        "stop_words": frozenset(nltk.corpus.stopwords.words('english')),
     }
 
 
@@ -33,18 +73,52 @@ def get_wordnet_pos(treebank_tag: str) -> str:
     return nltk.corpus.wordnet.NOUN
 
 
-def get_synonyms(word: str, pos: str, lemmatizer, stop_words: set) -> List[str]:
-    return [
+@lru_cache(maxsize=100000)
+def _synset_lemmas(word: str, pos: str) -> frozenset:
+    return frozenset(
         lemma.name() for syn in nltk.corpus.wordnet.synsets(word, pos)
         for lemma in syn.lemmas()
-        if lemma.name() != word and lemma.name() not in stop_words
-    ]
+    )
+
+
+_SYNONYMS_CACHE = {}
+
+
+def get_synonyms(word: str, pos: str) -> List[str]:
+    key = (word, pos)
+    synonyms = _SYNONYMS_CACHE.get(key)
+    if synonyms is None:
+        synonyms = [
+            name for name in _synset_lemmas(word, pos)
+            if name != word and name not in _STOP_WORDS
+        ]
+        _SYNONYMS_CACHE[key] = synonyms
+    return synonyms
+
+
+_CONJUNCTION_REPLACEMENTS = {
+    'and': ['moreover', 'furthermore', 'additionally'],
+    'but': ['however', 'nevertheless', 'on the contrary'],
+    'or': ['alternatively', 'or else', 'either'],
+}
+_ALL_CONJ_RE = re.compile(r'\b(' + '|'.join(map(re.escape, _CONJUNCTION_REPLACEMENTS)) + r')\b')
+_PASSIVE_RE = re.compile(r'(\w+)( is| was| has been| have been)( \w+)')
+_PERIOD_RE = re.compile(r'\.$')
+_COMMA_RE = re.compile(r',')
+
+# PCG64 generator; reseeded per worker in _init_worker so forked workers
+# do not replay the same stream.
+_RNG = np.random.default_rng()
 
 
 def change_word_order(words: List[str], probability: float = 0.1) -> List[str]:
-    if len(words) < 4 or random.random() > probability:
+    if random.random() > probability or len(words) < 4:
         return words
-    idx1, idx2 = random.sample(range(len(words)), 2)
+    n = len(words)
+    idx1 = random.randrange(n)
+    idx2 = random.randrange(n - 1)
+    if idx2 >= idx1:  # reroll collision into the remaining index space
+        idx2 += 1
     words[idx1], words[idx2] = words[idx2], words[idx1]
     return words
 
@@ -63,93 +137,176 @@ def _apply_sentence_modifications(sentence: str) -> str:
         ", a phenomenon well-known in the field", ", an aspect often overlooked",
         ", a term coined by experts"
     ]
-    conjunction_replacements = {
-        'and': ['moreover', 'furthermore', 'additionally'],
-        'but': ['however', 'nevertheless', 'on the contrary'],
-        'or': ['alternatively', 'or else', 'either'],
-    }
     intro_phrases = ['In fact, ', 'Notably, ', 'Furthermore, ', 'Consequently, ']
 
-    if random.random() < 0.3:
-        clause = random.choice(clauses)
-        pos = random.randint(5, len(sentence) - 5)
-        sentence = sentence[:pos] + ' ' + clause + ' ' + sentence[pos:]
-
-    if random.random() < 0.25 and 'is' in sentence:
-        pronoun = random.choice(pronouns)
-        insert_pos = sentence.find('is')
-        sentence = sentence[:insert_pos] + ' ' + pronoun + ' ' + sentence[insert_pos:]
-
-    if random.random() < 0.2:
-        pattern = r'(\w+)( is| was| has been| have been)( \w+)'
-        match = re.search(pattern, sentence)
+    # One batched draw covers every randomized decision below
+    u = _RNG.random(8)
+
+    # Buffer insertions as (offset, text) deltas against the original string
+    # and splice them in with a single join instead of repeated concatenation
+    edits = []
+
+    if u[0] < 0.3:
+        clause = clauses[_RNG.integers(len(clauses))]
+        pos = int(_RNG.integers(5, len(sentence) - 4))
+        edits.append((pos, ' ' + clause + ' '))
+
+    if u[1] < 0.25 and 'is' in sentence:
+        pronoun = pronouns[_RNG.integers(len(pronouns))]
+        edits.append((sentence.find('is'), ' ' + pronoun + ' '))
+
+    if u[3] < 0.15:
+        pos = int(_RNG.integers(5, len(sentence) - 4))
+        edits.append((pos, appositives[_RNG.integers(len(appositives))]))
+
+    if edits:
+        edits.sort()
+        parts = []
+        prev = 0
+        for offset, inserted in edits:
+            parts.append(sentence[prev:offset])
+            parts.append(inserted)
+            prev = offset
+        parts.append(sentence[prev:])
+        sentence = ''.join(parts)
+
+    if u[2] < 0.2:
+        match = _PASSIVE_RE.search(sentence)
         if match:
             verb, tense, object = match.groups()
             if verb not in ["is", "was"]:
-                sentence = re.sub(pattern, f"{object} {tense} {verb}ed", sentence, 1)
-
-    if random.random() < 0.15:
-        insert_pos = random.randint(5, len(sentence) - 5)
-        sentence = sentence[:insert_pos] + random.choice(appositives) + sentence[insert_pos:]
-
-    for conj, replacements in conjunction_replacements.items():
-        if conj in sentence:
-            sentence = re.sub(
-                rf'\b{re.escape(conj)}\b',
-                lambda m: random.choice(replacements),
-                sentence,
-                1
-            )
+                sentence = _PASSIVE_RE.sub(f"{object} {tense} {verb}ed", sentence, 1)
+
+    replaced_conjs = set()
+
+    def _replace_conj(match: re.Match) -> str:
+        conj = match.group(1)
+        if conj in replaced_conjs:  # keep the once-per-conjunction semantics
+            return conj
+        replaced_conjs.add(conj)
+        replacements = _CONJUNCTION_REPLACEMENTS[conj]
+        return replacements[_RNG.integers(len(replacements))]
+
+    sentence = _ALL_CONJ_RE.sub(_replace_conj, sentence)
 
-    if random.random() < 0.3:
+    if u[4] < 0.3:
         if '.' in sentence:
-            sentence = re.sub(r'\.$', lambda m: ';' if random.random() < 0.5 else '.', sentence)
+            sentence = _PERIOD_RE.sub(';' if u[5] < 0.5 else '.', sentence)
         elif ',' in sentence:
-            sentence = re.sub(r',', lambda m: ';' if random.random() < 0.5 else ',', sentence, 1)
+            sentence = _COMMA_RE.sub(';' if u[5] < 0.5 else ',', sentence, 1)
 
-    if random.random() < 0.2 and len(sentence) > 30:
-        pos = random.randint(10, len(sentence) - 10)
+    if u[6] < 0.2 and len(sentence) > 30:
+        pos = int(_RNG.integers(10, len(sentence) - 9))
         first_part = sentence[:pos].rstrip()
         second_part = sentence[pos:].lstrip()
         if first_part and second_part:
             sentence = f"{first_part}. {second_part}"
 
-    if random.random() < 0.15:
-        sentence = random.choice(intro_phrases) + sentence
+    if u[7] < 0.15:
+        sentence = intro_phrases[_RNG.integers(len(intro_phrases))] + sentence
     return sentence
 
 
-def paraphrase_text(text: str, lemmatizer, stop_words) -> str:
-    sentences = nltk.sent_tokenize(text)
-    new_sentences = []
+# Per-process NLP resources, set up once per worker by _init_worker.
+_LEMMATIZER = None
+_STOP_WORDS = None
+
+_CHUNK_SIZE = 64
+
+
+def _init_worker() -> None:
+    global _LEMMATIZER, _STOP_WORDS, _RNG
+    resources = initialize_nlp_resources()
+    _LEMMATIZER = resources["lemmatizer"]
+    _STOP_WORDS = resources["stop_words"]
+    _RNG = np.random.default_rng()
+
+
+def _tag_sentences(sentences: List[str]) -> List[List[tuple]]:
+    if _SPACY_NLP is not None:
+        # Penn Treebank tags either way; pool workers keep the pipe single-process
+        return [
+            [(token.text, token.tag_) for token in doc]
+            for doc in _SPACY_NLP.pipe(sentences, batch_size=_CHUNK_SIZE)
+        ]
+    tokenized = [nltk.word_tokenize(sentence) for sentence in sentences]
+    return _TAGGER.tag_sents(tokenized)
+
+
+def _paraphrase_chunk(sentences: List[str]) -> List[str]:
+    # First pass: partition tokens once, then lemmatize only the alnum ones
+    prepared = []
+    for tagged in _tag_sentences(sentences):
+        words = [word for word, _ in tagged]
+        alnum = [
+            (i, word, get_wordnet_pos(tag))
+            for i, (word, tag) in enumerate(tagged) if word.isalnum()
+        ]
+        lemmas = [_LEMMATIZER.lemmatize(word, pos=wn_pos) for _, word, wn_pos in alnum]
+        prepared.append((words, alnum, lemmas))
+
+    # One WordNet lookup per unique (lemma, pos) pair in the chunk
+    syn_map = {
+        (lemma, wn_pos): get_synonyms(lemma, wn_pos)
+        for _, alnum, lemmas in prepared
+        for (_, _, wn_pos), lemma in zip(alnum, lemmas)
+    }
 
-    for sentence in sentences:
-        words = nltk.word_tokenize(sentence)
-        tagged = nltk.pos_tag(words)
-        new_words = []
-
-        for word, tag in tagged:
-            if word.isalnum():
-                wn_pos = get_wordnet_pos(tag)
-                lemma = lemmatizer.lemmatize(word, pos=wn_pos)
-                synonyms = get_synonyms(lemma, wn_pos, lemmatizer, stop_words)
-                new_words.append(random.choice(synonyms) if synonyms else word)
-            else:
-                new_words.append(word)
+    # Second pass: scatter-write rewrites at the stored token indices
+    new_sentences = []
+    for words, alnum, lemmas in prepared:
+        new_words = list(words)
+        for (i, _, wn_pos), lemma in zip(alnum, lemmas):
+            synonyms = syn_map[(lemma, wn_pos)]
+            if synonyms:
+                new_words[i] = random.choice(synonyms)
 
         new_words = change_word_order(new_words)
-        new_sentence = enhance_sentence_structure(' '.join(new_words))
-        new_sentences.append(new_sentence)
+        new_sentences.append(enhance_sentence_structure(' '.join(new_words)))
+
+    return new_sentences
+
+
+def paraphrase_text(text: str, pool: Optional[multiprocessing.pool.Pool] = None) -> str:
+    sentences = nltk.sent_tokenize(text)
+    chunks = [sentences[i:i + _CHUNK_SIZE] for i in range(0, len(sentences), _CHUNK_SIZE)]
+
+    if pool is None:
+        results = map(_paraphrase_chunk, chunks)
+    else:
+        results = pool.imap(_paraphrase_chunk, chunks)
 
+    new_sentences = []
+    for chunk in results:
+        new_sentences.extend(chunk)
     return ' '.join(new_sentences)
 
 
+_DOCX_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_DOCX_T_TAG = f'{{{_DOCX_W_NS}}}t'
+_DOCX_P_TAG = f'{{{_DOCX_W_NS}}}p'
+
+
+def read_docx_text(file_path: str) -> str:
+    paragraphs = []
+    chunks = []
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document:
+        for _, element in etree.iterparse(document, tag=(_DOCX_T_TAG, _DOCX_P_TAG)):
+            if element.tag == _DOCX_T_TAG:
+                chunks.append(element.text or '')
+            else:
+                paragraphs.append(''.join(chunks))
+                chunks.clear()
+            element.clear()
+    if chunks:
+        paragraphs.append(''.join(chunks))
+    return ' '.join(paragraphs)
+
+
 def read_file(file_path: str) -> str:
     try:
         if file_path.lower().endswith('.docx'):
-            with open(file_path, 'rb') as file:
-                doc = Document(file)
-                return ' '.join([paragraph.text for paragraph in doc.paragraphs])
+            return read_docx_text(file_path)
         elif file_path.lower().endswith('.txt'):
             with open(file_path, 'r', encoding='utf-8') as file:
                 return file.read().strip()
@@ -160,13 +317,12 @@ def read_file(file_path: str) -> str:
 
 
 def process_document(file_path: str) -> str:
-    nlp_resources = initialize_nlp_resources()
-    lemmatizer = nlp_resources["lemmatizer"]
-    stop_words = nlp_resources["stop_words"]
+    _init_worker()  # Make sure NLTK data is in place before forking workers
 
     try:
         content = read_file(file_path)
-        return paraphrase_text(content, lemmatizer, stop_words)
+        with multiprocessing.Pool(initializer=_init_worker) as pool:
+            return paraphrase_text(content, pool)
     except (ValueError, IOError) as e:
         print(f"Processing error: {e}")
         return ""